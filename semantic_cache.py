@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import inspect
+import functools
+import importlib.util
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+
+def default_embedder() -> Optional[Callable[[str], np.ndarray]]:
+    """Return a sentence embedding function, or None if sentence-transformers is unavailable.
+
+    The model itself is only loaded the first time the function is called.
+    """
+    if importlib.util.find_spec("sentence_transformers") is None:
+        return None
+
+    model = None
+    # Embeddings may be computed on several executor threads; load the model only once
+    load_lock = threading.Lock()
+
+    def embed(text: str) -> np.ndarray:
+        nonlocal model
+        if model is None:
+            with load_lock:
+                if model is None:
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        return model.encode(text)
+
+    return embed
+
+
+def _normalize(vector) -> np.ndarray:
+    """Return vector as a unit-length float32 array."""
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class _EmbeddingIndex:
+    """Unit-length embeddings stored as rows of one contiguous float32 matrix.
+
+    Cosine similarity against every row is then a single matrix-vector product.
+    """
+
+    def __init__(self, dim: int, initial_rows: int = 16):
+        self._emb = np.empty((initial_rows, dim), dtype=np.float32)
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+    def add(self, key: str, vector: np.ndarray):
+        """Insert or replace the embedding for key."""
+        if key in self._rows:
+            self._emb[self._rows[key]] = vector
+            return
+
+        n = len(self._keys)
+        if n == len(self._emb):
+            # Grow geometrically so inserts stay amortized O(d)
+            grown = np.empty((2 * n, self._emb.shape[1]), dtype=np.float32)
+            grown[:n] = self._emb
+            self._emb = grown
+
+        self._emb[n] = vector
+        self._keys.append(key)
+        self._rows[key] = n
+
+    def remove(self, key: str):
+        """Drop key, moving the last row into its slot to keep rows contiguous."""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+
+        last = len(self._keys) - 1
+        if row != last:
+            self._emb[row] = self._emb[last]
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+
+    def search(self, query: np.ndarray) -> Tuple[Optional[str], float]:
+        """Return the key most similar to a unit-length query and its cosine similarity."""
+        if not self._keys:
+            return None, -1.0
+
+        sims = self._emb[:len(self._keys)] @ query
+        best = int(sims.argmax())
+        return self._keys[best], float(sims[best])
+
+
+class SemanticCache:
+    """Two-tier LRU cache of responses: exact prompt match first, then embedding similarity."""
+
+    def __init__(self, capacity: int = 256, threshold: float = 0.95,
+                 embed: Optional[Callable[[str], np.ndarray]] = None):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.embed = embed
+
+        # key -> result, ordered from least to most recently used
+        self._exact_cache: "OrderedDict[str, Any]" = OrderedDict()
+        # One embedding index per model so matches never cross models
+        self._indexes: Dict[str, _EmbeddingIndex] = {}
+        # key -> model, used to find an evicted key's index
+        self._models: Dict[str, str] = {}
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        """Hash a (model, prompt) pair into a cache key."""
+        return hashlib.sha256(orjson.dumps([model, prompt])).hexdigest()
+
+    def embed_prompt(self, prompt: str) -> Optional[np.ndarray]:
+        """Return the normalized embedding of a prompt, or None when no embedder is usable.
+
+        If embedding fails (e.g. the model can't be downloaded) the semantic tier is
+        switched off, so the lookup is a miss and only exact matches hit from then on.
+        """
+        embed = self.embed
+        if embed is None:
+            return None
+        try:
+            return _normalize(embed(prompt))
+        except Exception as e:
+            if self.embed is not None:
+                self.embed = None
+                print(f"Semantic cache disabled, embedding failed: {e}")
+            return None
+
+    def get(self, model: str, prompt: str) -> Optional[Any]:
+        """Return the result cached for exactly this prompt, or None on a miss."""
+        key = self.key(model, prompt)
+        if key in self._exact_cache:
+            self._exact_cache.move_to_end(key)
+            return self._exact_cache[key]
+        return None
+
+    def get_similar(self, model: str, embedding: np.ndarray) -> Optional[Any]:
+        """Return the result cached for the most similar prompt above the threshold, or None."""
+        index = self._indexes.get(model)
+        if index is None:
+            return None
+
+        best_key, similarity = index.search(embedding)
+        if best_key is None or similarity <= self.threshold:
+            return None
+
+        self._exact_cache.move_to_end(best_key)
+        return self._exact_cache[best_key]
+
+    def put(self, model: str, prompt: str, result: Any, embedding: Optional[np.ndarray] = None):
+        """Store a result, evicting the least recently used entry when full.
+
+        Only entries stored with an embedding can be returned by get_similar.
+        """
+        if self.capacity <= 0:
+            return
+
+        key = self.key(model, prompt)
+        self._exact_cache[key] = result
+        self._exact_cache.move_to_end(key)
+
+        if embedding is not None:
+            if model not in self._indexes:
+                self._indexes[model] = _EmbeddingIndex(len(embedding))
+            self._indexes[model].add(key, embedding)
+            self._models[key] = model
+
+        while len(self._exact_cache) > self.capacity:
+            evicted, _ = self._exact_cache.popitem(last=False)
+            evicted_model = self._models.pop(evicted, None)
+            if evicted_model is not None:
+                self._indexes[evicted_model].remove(evicted)
+
+
+def semantic_cache(model: str, input_type: str, to_prompt: Callable[[Any], str] = str, semantic: bool = True):
+    """Decorate a CompoundAI process method so repeated prompts skip the API call.
+
+    The wrapped method's instance must expose a SemanticCache as `self.cache`.
+    Entries are namespaced by input_type as well as model, so a hit always has
+    the right result type. With semantic=False only exact prompt repeats hit,
+    for inputs where near-identical prompts can still need different answers.
+    Cache hits return the stored result with the lookup time as its latency.
+    """
+    namespace = f"{input_type}:{model}"
+
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, query):
+                start_time = time.time()
+                prompt = to_prompt(query)
+                cached = self.cache.get(namespace, prompt)
+                if cached is not None:
+                    return replace(cached, latency=time.time() - start_time)
+
+                embedding = None
+                if semantic:
+                    # Embedding is CPU-bound (and may load the model), keep it off the event loop
+                    loop = asyncio.get_running_loop()
+                    embedding = await loop.run_in_executor(None, self.cache.embed_prompt, prompt)
+                    if embedding is not None:
+                        cached = self.cache.get_similar(namespace, embedding)
+                        if cached is not None:
+                            return replace(cached, latency=time.time() - start_time)
+
+                result = await method(self, query)
+                self.cache.put(namespace, prompt, result, embedding)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, query):
+            start_time = time.time()
+            prompt = to_prompt(query)
+            cached = self.cache.get(namespace, prompt)
+            if cached is not None:
+                return replace(cached, latency=time.time() - start_time)
+
+            embedding = None
+            if semantic:
+                embedding = self.cache.embed_prompt(prompt)
+                if embedding is not None:
+                    cached = self.cache.get_similar(namespace, embedding)
+                    if cached is not None:
+                        return replace(cached, latency=time.time() - start_time)
+
+            result = method(self, query)
+            self.cache.put(namespace, prompt, result, embedding)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,46 @@
+import queue
+import threading
+import time
+import pyttsx3
+
+# Text waiting to be spoken; producers put strings and return immediately
+TTS_QUEUE = queue.Queue()
+
+# When the engine last finished an utterance, used to recognize captured echoes
+_speech_ended_at = 0.0
+
+def heard_own_speech(audio):
+    """Return True if captured audio overlaps speech output, so the mic heard the assistant"""
+    started_at = time.time() - len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+    return TTS_QUEUE.unfinished_tasks > 0 or started_at < _speech_ended_at
+
+def _tts_loop():
+    """Own the text-to-speech engine for the life of the process and speak queued text"""
+    global _speech_ended_at
+
+    try:
+        # The engine is created on this thread since TTS backends are not thread-safe
+        engine = pyttsx3.init()
+        engine.setProperty('rate', 180)  # Slightly faster than default
+        engine.setProperty('volume', 0.9)
+
+        # Warm up the backend once so the first utterance doesn't pay for driver start-up
+        engine.runAndWait()
+    except Exception as e:
+        # Keep draining the queue so TTS_QUEUE.join() callers never hang without a TTS driver
+        print(f"Text-to-speech unavailable, speech output disabled: {e}")
+        engine = None
+
+    while True:
+        text = TTS_QUEUE.get()
+        try:
+            if engine is not None:
+                engine.say(text)
+                engine.runAndWait()
+        except Exception as e:
+            print(f"Error speaking text: {e}")
+        finally:
+            _speech_ended_at = time.time()
+            TTS_QUEUE.task_done()
+
+threading.Thread(target=_tts_loop, daemon=True).start()
@@ -1,46 +1,74 @@
 import speech_recognition as sr
-import pyttsx3
+from tts import TTS_QUEUE, heard_own_speech
+from faster_whisper import WhisperModel
 import groq
 import os
+import io
+import re
+import queue
+import threading
 
 # Initialize Groq client
 client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
 
-# Initialize text-to-speech engine
-engine = pyttsx3.init()
-engine.setProperty('rate', 180)  # Slightly faster than default
-engine.setProperty('volume', 0.9)
-
 # Initialize speech recognizer
 recognizer = sr.Recognizer()
 recognizer.energy_threshold = 300  # Adjust based on environment
 recognizer.dynamic_energy_threshold = True
+recognizer.pause_threshold = 0.4  # Seconds of silence that end an utterance (default 0.8)
+recognizer.non_speaking_duration = 0.3
+
+# Initialize local speech-to-text model (int8 on CPU, no network round trip)
+stt = WhisperModel("base.en", device="cpu", compute_type="int8")
+
+# Utterances captured by the capture thread, waiting to be transcribed;
+# a capture error is queued instead if the microphone fails
+audio_queue = queue.Queue()
+
+# System message sent with every request, built once rather than per call
+VOICE_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a helpful voice assistant. Keep responses concise and natural."
+}
+
+# Sentence boundary: terminator followed by whitespace, so "3.5" is not split
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
 
-def process_audio():
-    """Process audio from microphone and convert to text"""
+def capture_audio(source, stop_event):
+    """Keep pulling utterances from the open microphone stream onto audio_queue"""
+    while not stop_event.is_set():
+        try:
+            # Timeout lets the loop notice stop_event during silence
+            audio = recognizer.listen(source, timeout=1)
+        except sr.WaitTimeoutError:
+            continue
+        except Exception as e:
+            # Hand the failure to the main loop rather than leaving it waiting forever
+            audio_queue.put(e)
+            return
+
+        # Drop anything recorded while the assistant was speaking so it never answers itself
+        if not heard_own_speech(audio):
+            audio_queue.put(audio)
+
+def process_audio(audio):
+    """Convert captured audio to text"""
     try:
-        with sr.Microphone() as source:
-            print("Listening...")
-            audio = recognizer.listen(source)
-            text = recognizer.recognize_google(audio)
+        segments, _ = stt.transcribe(io.BytesIO(audio.get_wav_data()), beam_size=1, vad_filter=True)
+        text = "".join(segment.text for segment in segments).strip()
+        if text:
             return text
-    except sr.UnknownValueError:
         print("Could not understand audio")
-    except sr.RequestError as e:
-        print(f"Could not request results; {e}")
     except Exception as e:
         print(f"Error processing audio: {e}")
     return None
 
 def get_groq_response(prompt):
-    """Get response from Groq API"""
+    """Get response from Groq API, speaking each sentence as soon as it is complete"""
     try:
         chat_completion = client.chat.completions.create(
             messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful voice assistant. Keep responses concise and natural."
-                },
+                VOICE_SYSTEM_MESSAGE,
                 {
                     "role": "user",
                     "content": prompt
@@ -53,44 +81,77 @@ def get_groq_response(prompt):
         )
         
         response = ""
+        buffer = ""
         for chunk in chat_completion:
             if chunk.choices[0].delta.content:
                 response += chunk.choices[0].delta.content
+                buffer += chunk.choices[0].delta.content
+
+                # Hand finished sentences to TTS while the rest is still generating
+                *sentences, buffer = SENTENCE_END.split(buffer)
+                for sentence in sentences:
+                    speak(sentence)
+
+        if buffer.strip():
+            speak(buffer)
                 
         return response
     except Exception as e:
         print(f"Error getting Groq response: {e}")
-        return "I apologize, but I encountered an error processing your request."
+        error_message = "I apologize, but I encountered an error processing your request."
+        speak(error_message)
+        return error_message
 
 def speak(text):
-    """Convert text to speech"""
-    engine.say(text)
-    engine.runAndWait()
+    """Queue text for speech without waiting for playback"""
+    TTS_QUEUE.put(text)
 
 def main():
     print("Voice Agent starting up...")
     speak("Hello! I'm your voice assistant powered by Groq. How can I help you today?")
-    
-    print("Listening... (Press Ctrl+C to exit)")
-    try:
-        while True:
-            # Get text from audio
-            user_input = process_audio()
-            if user_input:
-                print(f"You said: {user_input}")
-                
-                # Get AI response
-                response = get_groq_response(user_input)
-                print(f"Assistant: {response}")
-                
-                # Convert response to speech
-                speak(response)
-                    
-    except KeyboardInterrupt:
-        print("\nStopping voice agent...")
-        speak("Goodbye!")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    # Let the greeting finish so calibration and capture don't hear it
+    TTS_QUEUE.join()
+
+    # Open the microphone stream once; calibration and every utterance share it
+    with sr.Microphone() as source:
+        # Calibrate for ambient noise once at startup
+        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+
+        # Keep the microphone listening while earlier utterances are answered
+        stop_capture = threading.Event()
+        capture_thread = threading.Thread(target=capture_audio, args=(source, stop_capture), daemon=True)
+        capture_thread.start()
+
+        print("Listening... (Press Ctrl+C to exit)")
+        try:
+            while True:
+                try:
+                    # Short timeout keeps the loop responsive to Ctrl+C
+                    audio = audio_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if isinstance(audio, Exception):
+                    raise audio
+
+                # Get text from audio
+                user_input = process_audio(audio)
+                if user_input:
+                    print(f"You said: {user_input}")
+
+                    # Get AI response; sentences are spoken as they stream in
+                    response = get_groq_response(user_input)
+                    print(f"Assistant: {response}")
+
+        except KeyboardInterrupt:
+            print("\nStopping voice agent...")
+            speak("Goodbye!")
+            TTS_QUEUE.join()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+        finally:
+            # Stop reading before the stream is closed
+            stop_capture.set()
+            capture_thread.join()
 
 if __name__ == "__main__":
     main()